@@ -0,0 +1,346 @@
+# app/database/order_batcher.py
+
+"""
+This module provides an OrderBatcher class that group-commits new orders.
+
+Concurrent order submissions are collected for a short window, then priced and
+inserted together inside a single transaction, so a burst of orders costs one
+pool connection and one commit instead of one of each per order.
+"""
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import asyncpg
+
+from app.database.db import Database, get_database
+from app.models.pizza import OrderCreate
+
+# Global variable to cache the order batcher instance
+ORDER_BATCHER_INSTANCE = None
+
+# Sentinel placed on the queue to tell the worker to flush and exit
+_STOP = None
+
+
+class OrderQueueFullError(Exception):
+    """
+    This exception is raised when the order queue is at capacity.
+    """
+
+    def __init__(self, retry_after: int):
+        """
+        This method initializes the OrderQueueFullError class
+        :param retry_after: seconds the client should wait before retrying
+        """
+        super().__init__("Too many pending orders, please try again shortly.")
+        self.retry_after = retry_after
+
+
+class OrderBatcherStoppedError(Exception):
+    """
+    This exception is raised when an order is submitted while the batcher is not running.
+    """
+
+    def __init__(self):
+        """
+        This method initializes the OrderBatcherStoppedError class
+        """
+        super().__init__(
+            "Orders are not being accepted right now, the service is shutting down."
+        )
+
+
+class OrderValidationError(Exception):
+    """
+    This exception is raised when an order refers to a pizza size, style, or topping
+    that does not exist.
+    """
+
+    def __init__(self):
+        """
+        This method initializes the OrderValidationError class
+        """
+        super().__init__("Unknown pizza size, style, or topping.")
+
+
+# Per-row data errors are worth isolating by splitting the batch; anything else
+# (connection, pool, or timeout errors) would fail again for every half
+_ROW_ERRORS = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError)
+
+
+# The worker and the commit notifier each need their own task and state
+class OrderBatcher:  # pylint: disable=too-many-instance-attributes
+    """
+    This class batches concurrent order inserts into group commits.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        window_ms: float = 5.0,
+        max_batch_size: int = 100,
+        max_queue_size: int = 1000,
+        retry_after: int = 1,
+    ):
+        """
+        This method initializes the OrderBatcher class
+        :param database: database to insert the orders into
+        :param window_ms: milliseconds to wait for more orders before flushing a batch
+        :param max_batch_size: maximum number of orders inserted per transaction
+        :param max_queue_size: maximum number of orders waiting to be inserted
+        :param retry_after: seconds a rejected client should wait before retrying
+        """
+        self.database = database
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.retry_after = retry_after
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._worker: Optional[asyncio.Task] = None
+        self._on_commit: Optional[Callable[[], Awaitable[None]]] = None
+        self._notifier: Optional[asyncio.Task] = None
+        self._notify_again = False
+
+    async def start(
+        self, on_commit: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> None:
+        """
+        This method starts the background worker that flushes batches
+        :param on_commit: coroutine function awaited once after each committed batch
+        :return: None
+        """
+        self._on_commit = on_commit
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        This method flushes any queued orders and stops the background worker
+        :return: None
+        """
+        worker, self._worker = self._worker, None
+        if worker is None:
+            return
+        await self._queue.put(_STOP)
+        await worker
+        if self._notifier is not None:
+            await self._notifier
+            self._notifier = None
+
+    async def submit(self, order: OrderCreate) -> dict:
+        """
+        This method queues an order and waits for it to be priced and committed
+        :param order: order to insert
+        :return: dict representing the inserted order row
+        """
+        if self._worker is None:
+            raise OrderBatcherStoppedError()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((order, future))
+        except asyncio.QueueFull as error:
+            raise OrderQueueFullError(self.retry_after) from error
+        return await future
+
+    async def _run(self) -> None:
+        """
+        This method collects queued orders into batches and flushes them
+        :return: None
+        """
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            # Give concurrent requests a moment to join, unless the batch is already full
+            if self._queue.qsize() < self.max_batch_size - 1:
+                await asyncio.sleep(self.window)
+            stopping = False
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            if await self._flush(batch):
+                self._notify()
+            if stopping:
+                return
+
+    async def _flush(self, batch: List[Tuple[OrderCreate, asyncio.Future]]) -> bool:
+        """
+        This method prices and inserts a batch of orders, isolating failures to the
+        orders that caused them
+        :param batch: queued orders paired with their caller's future
+        :return: True if any of the orders were committed
+        """
+        try:
+            results = await self._insert([order for order, _ in batch])
+        except _ROW_ERRORS as error:
+            if len(batch) == 1:
+                _resolve(batch[0][1], error=error)
+                return False
+            # One bad order must not fail everyone else in the batch, so split the batch
+            # in halves and retry each, which narrows down the bad orders in few commits
+            logging.warning("Order batch failed, retrying in halves: %s", error)
+            middle = len(batch) // 2
+            committed = await self._flush(batch[:middle])
+            return await self._flush(batch[middle:]) or committed
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            logging.error("Order batch of %d failed: %s", len(batch), error)
+            for _, future in batch:
+                _resolve(future, error=error)
+            return False
+        for (_, future), row in zip(batch, results):
+            if row is None:
+                _resolve(future, error=OrderValidationError())
+            else:
+                _resolve(future, result=row)
+        return any(row is not None for row in results)
+
+    def _notify(self) -> None:
+        """
+        This method runs the on_commit callback without holding up the next batch
+        :return: None
+        """
+        if self._on_commit is None:
+            return
+        if self._notifier is not None and not self._notifier.done():
+            # Coalesce commits made while a notification is in flight into one more
+            self._notify_again = True
+            return
+        self._notifier = asyncio.create_task(self._run_notifier())
+
+    async def _run_notifier(self) -> None:
+        """
+        This method awaits the on_commit callback until no commits are left unannounced
+        :return: None
+        """
+        while True:
+            self._notify_again = False
+            try:
+                await self._on_commit()
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                logging.error("Failed to notify about committed orders: %s", error)
+            if not self._notify_again:
+                return
+
+    async def _insert(self, orders: List[OrderCreate]) -> List[Optional[dict]]:
+        """
+        This method prices orders and inserts the valid ones and their toppings in a
+        single transaction
+        :param orders: orders to insert
+        :return: inserted order rows in the same order as the given orders, with None
+            for orders that refer to an unknown pizza size, style, or topping
+        """
+        # Duplicate toppings would violate the junction table's primary key
+        toppings = [list(dict.fromkeys(order.toppings or [])) for order in orders]
+        topping_indexes = [i for i, ids in enumerate(toppings) for _ in ids]
+        topping_ids = [topping_id for ids in toppings for topping_id in ids]
+
+        async with self.database.pool.acquire() as connection:
+            async with connection.transaction():
+                # Price every order in one query; orders with an unknown size, style,
+                # or topping produce no row
+                prices = await connection.fetch(
+                    """
+                    SELECT
+                        o.idx - 1 AS idx,
+                        pizza_sizes.price + pizza_styles.price
+                            + COALESCE(SUM(toppings.price), 0) AS price
+                    FROM unnest($1::int[], $2::int[]) WITH ORDINALITY AS o(size_id, style_id, idx)
+                    JOIN pizza_sizes ON pizza_sizes.id = o.size_id
+                    JOIN pizza_styles ON pizza_styles.id = o.style_id
+                    LEFT JOIN unnest($3::int[], $4::int[]) AS ot(idx, topping_id)
+                        ON ot.idx = o.idx - 1
+                    LEFT JOIN toppings ON toppings.id = ot.topping_id
+                    GROUP BY o.idx, pizza_sizes.price, pizza_styles.price
+                    HAVING COUNT(toppings.id) = COUNT(ot.topping_id)
+                    """,
+                    [order.size_id for order in orders],
+                    [order.style_id for order in orders],
+                    topping_indexes,
+                    topping_ids,
+                )
+                price_by_index = {record["idx"]: record["price"] for record in prices}
+                valid = sorted(price_by_index)
+                if not valid:
+                    return [None] * len(orders)
+
+                # Reserve the IDs up front so the rows can be matched to their callers
+                order_ids = await connection.fetch(
+                    "SELECT nextval(pg_get_serial_sequence('orders', 'order_id')) "
+                    "FROM generate_series(1, $1)",
+                    len(valid),
+                )
+                order_id_by_index = {
+                    i: record[0] for i, record in zip(valid, order_ids)
+                }
+                new_orders = await connection.fetch(
+                    """
+                    INSERT INTO orders
+                        (order_id, order_name, phone_number, size_id, style_id, price)
+                    SELECT * FROM unnest(
+                        $1::int[], $2::varchar[], $3::varchar[], $4::int[], $5::int[], $6::numeric[]
+                    )
+                    RETURNING *
+                    """,
+                    [order_id_by_index[i] for i in valid],
+                    [orders[i].order_name for i in valid],
+                    [orders[i].phone_number for i in valid],
+                    [orders[i].size_id for i in valid],
+                    [orders[i].style_id for i in valid],
+                    [price_by_index[i] for i in valid],
+                )
+                order_toppings = [
+                    (order_id_by_index[i], topping_id)
+                    for i, topping_id in zip(topping_indexes, topping_ids)
+                    if i in order_id_by_index
+                ]
+                if order_toppings:
+                    await connection.execute(
+                        """
+                        INSERT INTO order_toppings (order_id, topping_id)
+                        SELECT * FROM unnest($1::int[], $2::int[])
+                        """,
+                        [order_id for order_id, _ in order_toppings],
+                        [topping_id for _, topping_id in order_toppings],
+                    )
+        rows_by_id = {record["order_id"]: record for record in new_orders}
+        return [
+            rows_by_id[order_id_by_index[i]] if i in order_id_by_index else None
+            for i in range(len(orders))
+        ]
+
+
+def _resolve(
+    future: asyncio.Future, result=None, error: Optional[Exception] = None
+) -> None:
+    """
+    This function completes a caller's future unless the caller has gone away.
+    """
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def get_order_batcher() -> Optional[OrderBatcher]:
+    """
+    This function gets the order batcher object, or None if batching is disabled.
+    """
+    global ORDER_BATCHER_INSTANCE
+    if os.getenv("ORDER_BATCHING", "false").lower() not in ("1", "true", "yes"):
+        return None
+    if ORDER_BATCHER_INSTANCE is None:
+        ORDER_BATCHER_INSTANCE = OrderBatcher(
+            get_database(),
+            window_ms=float(os.getenv("ORDER_BATCH_WINDOW_MS", "5")),
+            max_batch_size=int(os.getenv("ORDER_BATCH_MAX_SIZE", "100")),
+            max_queue_size=int(os.getenv("ORDER_BATCH_MAX_QUEUE", "1000")),
+            retry_after=int(os.getenv("ORDER_BATCH_RETRY_AFTER", "1")),
+        )
+        logging.info("Order batching enabled")
+    return ORDER_BATCHER_INSTANCE
@@ -7,7 +7,7 @@ This module defines Pydantic models for Pizza Shop related data.
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class Message(BaseModel):
@@ -57,8 +57,9 @@ class OrderCreate(BaseModel):
     Pydantic model for creating an order.
     """
 
-    order_name: str
-    phone_number: str
+    # limits match the orders table columns
+    order_name: str = Field(max_length=100)
+    phone_number: str = Field(max_length=20)
     size_id: int
     style_id: int
     toppings: Optional[List[int]] = (
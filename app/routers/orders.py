@@ -7,7 +7,7 @@ This module defines the routes for managing pizza orders.
 import logging
 import os
 from enum import Enum
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter, HTTPException, Request, status, WebSocket, Query
 from fastapi.encoders import jsonable_encoder
@@ -16,6 +16,12 @@ from starlette.websockets import WebSocketDisconnect
 
 from app.connections.connection_manager import get_connection_manager
 from app.database.db import get_database
+from app.database.order_batcher import (
+    get_order_batcher,
+    OrderBatcherStoppedError,
+    OrderQueueFullError,
+    OrderValidationError,
+)
 from app.models.pizza import OrderCreate, Order, Price, Message, Count, Item, OrderInfo
 
 
@@ -39,6 +45,10 @@ async def startup() -> None:
     This event handler is called when the application starts up.
     """
     await get_database().connect()
+    batcher = get_order_batcher()
+    if batcher is not None:
+        # Notify clients once per committed batch rather than once per order
+        await batcher.start(notify_clients_about_order_update)
 
 
 @router.on_event("shutdown")
@@ -46,6 +56,9 @@ async def shutdown() -> None:
     """
     This event handler is called when the application shuts down.
     """
+    batcher = get_order_batcher()
+    if batcher is not None:
+        await batcher.stop()
     await get_database().close()
 
 
@@ -90,7 +103,7 @@ async def get_orders(order_status: OrderStatus = "pending") -> List[dict]:
             LEFT JOIN toppings t ON ot.topping_id = t.id
             WHERE o.status = $1
             GROUP BY o.order_id, ps.name, pss.name, o.created_at
-            ORDER BY o.created_at
+            ORDER BY o.created_at, o.order_id
         """
         orders = await get_database().fetch(sql, order_status)
         # Prepare orders for JSON serialization
@@ -176,38 +189,48 @@ async def create_order(order: OrderCreate) -> dict:
     This route creates a new order in the database.
     """
     try:
-        # Calculate order price
-        price = await get_order_price(order.size_id, order.style_id, order.toppings)
-        # Ensure total_price is a float, as Pydantic's default JSON encoder does not handle Decimal
-        price = float(price) if price is not None else 0.0
-
-        # Insert the order
-        order_query = """
-        INSERT INTO orders (order_name, phone_number, size_id, style_id, price)
-        VALUES ($1, $2, $3, $4, $5) RETURNING *
-        """
-        new_order = await get_database().fetchrow(
-            order_query,
-            order.order_name,
-            order.phone_number,
-            order.size_id,
-            order.style_id,
-            price,
-        )
+        batcher = get_order_batcher()
+        if batcher is not None:
+            # Queue the order to be priced and group-committed with other concurrent orders
+            new_order = await batcher.submit(order)
+        else:
+            # Calculate order price
+            price = await get_order_price(
+                order.size_id, order.style_id, order.toppings, validate=True
+            )
+            if price is None:
+                raise OrderValidationError()
+            # Ensure total_price is a float, as Pydantic's default JSON encoder does not
+            # handle Decimal
+            price = float(price)
+
+            # Insert the order
+            order_query = """
+            INSERT INTO orders (order_name, phone_number, size_id, style_id, price)
+            VALUES ($1, $2, $3, $4, $5) RETURNING *
+            """
+            new_order = await get_database().fetchrow(
+                order_query,
+                order.order_name,
+                order.phone_number,
+                order.size_id,
+                order.style_id,
+                price,
+            )
 
-        # Check if new_order is None (insertion failed)
-        if not new_order:
-            raise HTTPException(status_code=500, detail="Failed to create order.")
+            # Check if new_order is None (insertion failed)
+            if not new_order:
+                raise HTTPException(status_code=500, detail="Failed to create order.")
 
-        # Insert toppings into the junction table
-        if order.toppings:
-            toppings_query = (
-                "INSERT INTO order_toppings (order_id, topping_id) VALUES ($1, $2)"
-            )
-            for topping_id in order.toppings:
-                await get_database().execute(
-                    toppings_query, new_order["order_id"], topping_id
+            # Insert toppings into the junction table
+            if order.toppings:
+                toppings_query = (
+                    "INSERT INTO order_toppings (order_id, topping_id) VALUES ($1, $2)"
                 )
+                for topping_id in dict.fromkeys(order.toppings):
+                    await get_database().execute(
+                        toppings_query, new_order["order_id"], topping_id
+                    )
 
         # Convert new_order record to dict if necessary
         order_data = dict(new_order)
@@ -215,19 +238,42 @@ async def create_order(order: OrderCreate) -> dict:
         # Convert Decimal and datetime if not automatically handled
         order_data["price"] = float(order_data["price"])
 
-        await notify_clients_about_order_update()
+        # The batcher notifies clients itself after each committed batch
+        if batcher is None:
+            await notify_clients_about_order_update()
 
         # Return the order data
         return order_data
+    except HTTPException:
+        raise
+    except OrderQueueFullError as error:
+        logging.warning("Rejecting order: %s", error)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(error),
+            headers={"Retry-After": str(error.retry_after)},
+        ) from error
+    except OrderValidationError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)
+        ) from error
+    except OrderBatcherStoppedError as error:
+        logging.warning("Rejecting order: %s", error)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(error)
+        ) from error
     except Exception as error:
         logging.error("Error creating order: %s", error)
         raise HTTPException(status_code=500, detail=str(error)) from error
 
 
-async def get_order_price(size_id: int, style_id: int, toppings: List[int]) -> float:
+async def get_order_price(
+    size_id: int, style_id: int, toppings: List[int], validate: bool = False
+) -> Optional[float]:
     """
     This function calculates the total price of an order based on the pizza size, style,
-    and toppings.
+    and toppings. If validate is set, it returns None when the size, style, or any of the
+    toppings does not exist.
     """
     price_query = """
 SELECT 
@@ -242,9 +288,15 @@ WHERE
     pizza_sizes.id = $2
 GROUP BY 
     pizza_sizes.price, pizza_styles.price
+HAVING 
+    NOT $4 OR COUNT(DISTINCT toppings.id) = cardinality(ARRAY(SELECT DISTINCT unnest($1::int[])))
     """
-    price = await get_database().fetchval(price_query, toppings, size_id, style_id)
-    return price if price is not None else 0.0
+    price = await get_database().fetchval(
+        price_query, toppings or [], size_id, style_id, validate
+    )
+    if price is None and not validate:
+        return 0.0
+    return price
 
 
 @router.get("/api/price", response_model=Price)
@@ -0,0 +1,172 @@
+// app/ts/bench/order_view_bench.ts
+import { Tooltip } from '../src/common'
+import { OrderCards, OrderInfo } from '../src/order_cards'
+
+const ORDER_COUNT = 200
+const ITERATIONS = 50
+
+interface Scenario {
+    name: string
+    before: OrderInfo[]
+    after: OrderInfo[]
+}
+
+function makeOrder(orderId: number): OrderInfo {
+    return {
+        order_id: orderId,
+        order_name: `Customer ${orderId}`,
+        phone_number: `555-${(1000 + orderId).toString()}`,
+        size_name: 'Large',
+        style_name: 'Hand Tossed',
+        toppings: ['Pepperoni', 'Mushrooms', 'Onions'],
+        price: 20.5,
+        created_at: new Date(Date.UTC(2024, 0, 1, 12, 0, orderId)).toISOString(),
+    }
+}
+
+function makeScenarios(): Scenario[] {
+    const orders = Array.from({ length: ORDER_COUNT }, (_, index) => makeOrder(index + 1))
+    const changed = orders.map(order => ({ ...order }))
+    changed[ORDER_COUNT / 2]!.order_name = 'Renamed Customer'
+    return [
+        { name: 'unchanged', before: orders, after: orders.map(order => ({ ...order })) },
+        { name: 'one added', before: orders, after: [...orders, makeOrder(ORDER_COUNT + 1)] },
+        { name: 'one removed', before: orders, after: orders.slice(1) },
+        { name: 'middle removed', before: orders, after: orders.filter((_, index) => index !== ORDER_COUNT / 2) },
+        { name: 'one changed', before: orders, after: changed },
+    ]
+}
+
+// The full rebuild that updateOrdersDisplay performed before keyed updates, kept as the baseline
+function legacyRebuild(container: HTMLElement, orders: any[]): void {
+    container.innerHTML = ''
+
+    for (const order of orders) {
+        const orderCard = document.createElement('div')
+        orderCard.className = 'card mb-3 col-md-6'
+
+        const toppingsList = order.toppings && order.toppings.length > 0 && order.toppings[0]
+            ? '<ul>' + order.toppings.map((topping: string) => `<li>${topping}</li>`).join('') + '</ul>'
+            : '<em>None</em>'
+
+        orderCard.innerHTML = `
+            <div class="card-body">
+                <div class="d-flex justify-content-between align-items-start">
+                    <div>
+                        <h5 class="card-title">${order.order_name} (#${order.order_id})</h5>
+                        <h6 class="card-subtitle mb-2 text-muted">${order.phone_number}</h6>
+                    </div>
+                    <div>
+                        <button class="btn btn-outline-success ms-2" id="completeButton${order.order_id}" title="Complete Order #${order.order_id}">
+                            <i class="bi bi-check-circle-fill"></i>
+                        </button>
+                        <button class="btn btn-outline-danger ms-2" id="cancelButton${order.order_id}" title="Cancel Order #${order.order_id}">
+                            <i class="bi bi-x-circle-fill"></i>
+                        </button>
+                    </div>
+                </div>
+                <p class="card-text">${order.size_name} ${order.style_name} - $${parseFloat(order.price).toFixed(2)}</p>
+                <p class="card-text">Toppings: ${toppingsList}</p>
+                <p class="card-text"><small class="text-muted">Ordered at ${order.created_at}</small></p>
+            </div>
+        `
+
+        container.appendChild(orderCard)
+
+        const completeButton = document.getElementById(`completeButton${order.order_id}`)!
+        const cancelButton = document.getElementById(`cancelButton${order.order_id}`)!
+        new Tooltip(completeButton)
+        new Tooltip(cancelButton)
+        completeButton.addEventListener('click', () => console.log('complete', order.order_id))
+        cancelButton.addEventListener('click', () => console.log('cancel', order.order_id))
+    }
+}
+
+function disposeLegacyTooltips(container: HTMLElement): void {
+    container.querySelectorAll('button').forEach(button => Tooltip.getInstance(button)?.dispose())
+}
+
+function median(samples: number[]): number {
+    const sorted = [...samples].sort((a, b) => a - b)
+    return sorted[Math.floor(sorted.length / 2)]!
+}
+
+// Times one update, forcing layout so the cost of the DOM changes is included
+function timeUpdate(container: HTMLElement, update: () => void): number {
+    const start = performance.now()
+    update()
+    void container.offsetHeight
+    return performance.now() - start
+}
+
+// Counts the existing cards that a keyed update moves; only added cards should be inserted
+function countMovedCards(container: HTMLElement, orderCards: OrderCards, scenario: Scenario): number {
+    orderCards.update(scenario.before)
+    const existing = new Set(Array.from(container.children))
+    const observer = new MutationObserver(() => undefined)
+    observer.observe(container, { childList: true })
+    orderCards.update(scenario.after)
+    const records = observer.takeRecords()
+    observer.disconnect()
+
+    const moved = new Set<Node>()
+    for (const record of records) {
+        record.addedNodes.forEach(node => {
+            if (existing.has(node as Element)) {
+                moved.add(node)
+            }
+        })
+    }
+    return moved.size
+}
+
+function runScenario(container: HTMLElement, scenario: Scenario): { legacy: number, keyed: number, moved: number } {
+    const legacySamples: number[] = []
+    for (let i = 0; i < ITERATIONS; i++) {
+        disposeLegacyTooltips(container)
+        legacyRebuild(container, scenario.before)
+        legacySamples.push(timeUpdate(container, () => legacyRebuild(container, scenario.after)))
+    }
+    disposeLegacyTooltips(container)
+
+    const keyedSamples: number[] = []
+    const orderCards = new OrderCards(container)
+    for (let i = 0; i < ITERATIONS; i++) {
+        orderCards.update(scenario.before)
+        keyedSamples.push(timeUpdate(container, () => orderCards.update(scenario.after)))
+    }
+    const moved = countMovedCards(container, orderCards, scenario)
+    orderCards.update([])
+
+    return { legacy: median(legacySamples), keyed: median(keyedSamples), moved }
+}
+
+function runBenchmark(): void {
+    const container = document.getElementById('ordersContainer')!
+    const results = document.getElementById('benchResults')!
+    const lines = [`${ORDER_COUNT} orders, median of ${ITERATIONS} updates (ms)`, '']
+    lines.push(`${'scenario'.padEnd(16)}${'rebuild'.padStart(10)}${'keyed'.padStart(10)}${'speedup'.padStart(10)}`
+        + `${'moved'.padStart(8)}`)
+
+    let failed = false
+    for (const scenario of makeScenarios()) {
+        const { legacy, keyed, moved } = runScenario(container, scenario)
+        const speedup = keyed > 0 ? `${(legacy / keyed).toFixed(1)}x` : 'n/a'
+        // None of the scenarios reorders orders, so no existing card should be moved
+        const check = moved === 0 ? '' : '  FAIL: existing cards were moved'
+        failed = failed || moved !== 0
+        lines.push(`${scenario.name.padEnd(16)}${legacy.toFixed(2).padStart(10)}${keyed.toFixed(2).padStart(10)}`
+            + `${speedup.padStart(10)}${moved.toString().padStart(8)}${check}`)
+    }
+
+    results.textContent = lines.join('\n')
+    if (failed) {
+        console.error(results.textContent)
+    } else {
+        console.log(results.textContent)
+    }
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    runBenchmark()
+})
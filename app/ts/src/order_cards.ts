@@ -0,0 +1,158 @@
+// app/ts/src/order_cards.ts
+import { Tooltip } from './common'
+
+export interface OrderInfo {
+    order_id: number
+    order_name: string
+    phone_number: string
+    size_name: string
+    style_name: string
+    toppings: (string | null)[]
+    price: number | string
+    created_at: string
+}
+
+interface OrderCard {
+    element: HTMLElement
+    title: HTMLElement
+    phone: HTMLElement
+    description: HTMLElement
+    toppings: HTMLElement
+    createdAt: HTMLElement
+    toppingsKey: string
+}
+
+const CARD_TEMPLATE = `
+    <div class="card-body">
+        <div class="d-flex justify-content-between align-items-start">
+            <div>
+                <h5 class="card-title" data-field="title"></h5>
+                <h6 class="card-subtitle mb-2 text-muted" data-field="phone"></h6>
+            </div>
+            <div>
+                <button class="btn btn-outline-success ms-2" data-action="complete" data-bs-toggle="tooltip">
+                    <i class="bi bi-check-circle-fill"></i>
+                </button>
+                <button class="btn btn-outline-danger ms-2" data-action="cancel" data-bs-toggle="tooltip">
+                    <i class="bi bi-x-circle-fill"></i>
+                </button>
+            </div>
+        </div>
+        <p class="card-text" data-field="description"></p>
+        <p class="card-text">Toppings: <span data-field="toppings"></span></p>
+        <p class="card-text"><small class="text-muted" data-field="createdAt"></small></p>
+    </div>
+`
+
+function setText(element: HTMLElement, text: string): void {
+    // Only touch the DOM when the text actually changed
+    if (element.textContent !== text) {
+        element.textContent = text
+    }
+}
+
+/**
+ * Keeps a container of order cards in sync with a list of orders, keyed by order_id.
+ * Only added cards are created, only removed cards are torn down, and existing cards
+ * are patched field by field. Tooltips are delegated from the container, so cards do
+ * not carry their own Tooltip instances or event listeners.
+ */
+export class OrderCards {
+    private readonly cards = new Map<number, OrderCard>()
+
+    constructor(private readonly container: HTMLElement) {
+        container.innerHTML = ''
+        new Tooltip(container, { selector: '[data-bs-toggle="tooltip"]' })
+    }
+
+    update(orders: OrderInfo[]): void {
+        // Remove stale cards first, so they do not sit in the slots the remaining cards are
+        // checked against and force those cards to be moved
+        const orderIds = new Set(orders.map(order => order.order_id))
+        for (const [orderId, card] of this.cards) {
+            if (!orderIds.has(orderId)) {
+                this.removeCard(card)
+                this.cards.delete(orderId)
+            }
+        }
+
+        let previous: Element | null = null
+        for (const order of orders) {
+            let card = this.cards.get(order.order_id)
+            if (!card) {
+                card = this.createCard(order)
+                this.cards.set(order.order_id, card)
+            }
+            this.patchCard(card, order)
+
+            // Move the card only if it is not already in the right position
+            const expected: Element | null = previous ? previous.nextElementSibling : this.container.firstElementChild
+            if (expected !== card.element) {
+                this.container.insertBefore(card.element, expected)
+            }
+            previous = card.element
+        }
+    }
+
+    private createCard(order: OrderInfo): OrderCard {
+        const element = document.createElement('div')
+        element.className = 'card mb-3 col-md-6'
+        element.dataset['orderId'] = order.order_id.toString()
+        element.innerHTML = CARD_TEMPLATE
+
+        const completeButton = element.querySelector('[data-action="complete"]') as HTMLButtonElement
+        const cancelButton = element.querySelector('[data-action="cancel"]') as HTMLButtonElement
+        completeButton.id = `completeButton${order.order_id}`
+        completeButton.title = `Complete Order #${order.order_id}`
+        completeButton.dataset['orderId'] = order.order_id.toString()
+        cancelButton.id = `cancelButton${order.order_id}`
+        cancelButton.title = `Cancel Order #${order.order_id}`
+        cancelButton.dataset['orderId'] = order.order_id.toString()
+
+        const field = (name: string) => element.querySelector(`[data-field="${name}"]`) as HTMLElement
+        return {
+            element,
+            title: field('title'),
+            phone: field('phone'),
+            description: field('description'),
+            toppings: field('toppings'),
+            createdAt: field('createdAt'),
+            toppingsKey: '',
+        }
+    }
+
+    private patchCard(card: OrderCard, order: OrderInfo): void {
+        setText(card.title, `${order.order_name} (#${order.order_id})`)
+        setText(card.phone, order.phone_number)
+        setText(card.description,
+            `${order.size_name} ${order.style_name} - $${parseFloat(order.price.toString()).toFixed(2)}`)
+        setText(card.createdAt, `Ordered at ${order.created_at}`)
+
+        const toppings = (order.toppings || []).filter((topping): topping is string => !!topping)
+        const toppingsKey = toppings.join('\n')
+        if (toppingsKey !== card.toppingsKey || !card.toppings.firstChild) {
+            card.toppingsKey = toppingsKey
+            if (toppings.length > 0) {
+                const list = document.createElement('ul')
+                for (const topping of toppings) {
+                    const item = document.createElement('li')
+                    item.textContent = topping
+                    list.appendChild(item)
+                }
+                card.toppings.replaceChildren(list)
+            } else {
+                const none = document.createElement('em')
+                none.textContent = 'None'
+                card.toppings.replaceChildren(none)
+            }
+        }
+    }
+
+    private removeCard(card: OrderCard): void {
+        // Dispose tooltips lazily created by the delegated Tooltip so none are left orphaned
+        card.element.querySelectorAll('[data-action]').forEach(button => {
+            Tooltip.getInstance(button)?.dispose()
+        })
+        card.element.remove()
+    }
+}
@@ -1,5 +1,6 @@
 // app/ts/src/order_view.ts
 import { Modal, Tooltip, showAlert } from './common'
+import { OrderCards, OrderInfo } from './order_cards'
 import notificationSoundUrl from "url:../../resources/audio/tap_notification.mp3"
 
 function orderView() {
@@ -72,58 +73,23 @@ function orderView() {
         confirmModal.show()
     }
 
-    function attachButtonHandlers(orderId: number) {
-        const completeButton = document.getElementById(`completeButton${orderId}`)!
-        const cancelButton = document.getElementById(`cancelButton${orderId}`)!
+    const ordersContainer = document.getElementById('ordersContainer')!
+    const orderCards = new OrderCards(ordersContainer)
 
-        new Tooltip(completeButton)
-        new Tooltip(cancelButton)
-
-        completeButton.addEventListener('click', () => showConfirmationModal('complete', orderId))
-        cancelButton.addEventListener('click', () => showConfirmationModal('cancel', orderId))
-    }
+    // A single delegated listener handles the buttons of every order card
+    ordersContainer.addEventListener('click', (event: MouseEvent) => {
+        const button = (event.target as HTMLElement).closest('button[data-action]') as HTMLButtonElement | null
+        if (button && ordersContainer.contains(button)) {
+            showConfirmationModal(button.dataset['action']!, parseInt(button.dataset['orderId']!, 10))
+        }
+    })
 
-    function updateOrdersDisplay(orders: any[], connectionCount: number) {
+    function updateOrdersDisplay(orders: OrderInfo[], connectionCount: number) {
         const orderCountElement = document.getElementById('orderCount')!
         const connectionCountElement = document.getElementById('connectionCount')!
-        const ordersContainer = document.getElementById('ordersContainer')!
         orderCountElement.textContent = orders.length.toString()
         connectionCountElement.textContent = connectionCount.toString()
-        ordersContainer.innerHTML = ''
-
-        for (const order of orders) {
-            const orderCard = document.createElement('div')
-            orderCard.className = 'card mb-3 col-md-6'
-
-            const toppingsList = order.toppings && order.toppings.length > 0 && order.toppings[0]
-                ? '<ul>' + order.toppings.map((topping: string) => `<li>${topping}</li>`).join('') + '</ul>'
-                : '<em>None</em>'
-
-            orderCard.innerHTML = `
-            <div class="card-body">
-                <div class="d-flex justify-content-between align-items-start">
-                    <div>
-                        <h5 class="card-title">${order.order_name} (#${order.order_id})</h5>
-                        <h6 class="card-subtitle mb-2 text-muted">${order.phone_number}</h6>
-                    </div>
-                    <div>
-                        <button class="btn btn-outline-success ms-2" id="completeButton${order.order_id}" title="Complete Order #${order.order_id}">
-                            <i class="bi bi-check-circle-fill"></i>
-                        </button>
-                        <button class="btn btn-outline-danger ms-2" id="cancelButton${order.order_id}" title="Cancel Order #${order.order_id}">
-                            <i class="bi bi-x-circle-fill"></i>
-                        </button>
-                    </div>
-                </div>
-                <p class="card-text">${order.size_name} ${order.style_name} - $${parseFloat(order.price).toFixed(2)}</p>
-                <p class="card-text">Toppings: ${toppingsList}</p>
-                <p class="card-text"><small class="text-muted">Ordered at ${order.created_at}</small></p>
-            </div>
-        `
-
-            ordersContainer.appendChild(orderCard)
-            attachButtonHandlers(order.order_id)
-        }
+        orderCards.update(orders)
     }
 
     function connect() {